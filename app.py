@@ -4,19 +4,31 @@ from utils.ocr_utils import extract_text_from_image
 from utils.date_parser import parse_expiry_date
 from utils.damage_detection import detect_damage
 from utils.report_genearator import generate_daily_report, generate_weekly_report
+from utils.upload_utils import (UploadError, save_upload, save_base64_capture,
+                                MAX_CAPTURE_CHARS)
 
-import os, base64
+import os
 from datetime import datetime, date
 import database   # loads db = Database()
 
 app = Flask(__name__)
 
 # ---------------- FOLDERS ----------------
-app.config['UPLOAD_FOLDER'] = 'uploads'
-app.config['PROCESSED_FOLDER'] = 'processed'
+# Point both at a scratch directory (e.g. for load tests) through the environment
+app.config['UPLOAD_FOLDER'] = os.environ.get('DETECTMED_UPLOAD_FOLDER', 'uploads')
+app.config['PROCESSED_FOLDER'] = os.environ.get('DETECTMED_PROCESSED_FOLDER', 'processed')
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 os.makedirs(app.config['PROCESSED_FOLDER'], exist_ok=True)
 
+# ---------------- UPLOAD LIMITS ----------------
+# Non-file form fields, i.e. the base64 camera capture. The browser
+# percent-encodes '+' and '/', so leave headroom over the decoded limit;
+# save_base64_capture() enforces the exact byte limit afterwards.
+app.config['MAX_FORM_MEMORY_SIZE'] = 2 * MAX_CAPTURE_CHARS
+# Whole request body. Werkzeug spools multipart file parts to a temp file,
+# so only the non-file fields above are ever held in memory.
+app.config['MAX_CONTENT_LENGTH'] = app.config['MAX_FORM_MEMORY_SIZE'] + 64 * 1024
+
 # ---------------- INIT DB ----------------
 database.db.init_db()
 
@@ -27,6 +39,18 @@ def processed_file(filename):
     return send_from_directory(app.config['PROCESSED_FOLDER'], filename)
 
 
+# ---------------- UPLOAD ERRORS ----------------
+@app.errorhandler(413)
+def too_large(e):
+    # same text as save_upload's byte-limit UploadError
+    return "File too large", 413
+
+
+@app.errorhandler(UploadError)
+def upload_error(e):
+    return e.message, e.status
+
+
 # ---------------- HOME ----------------
 @app.route('/')
 def index():
@@ -38,7 +62,7 @@ def _process_common(filepath, original_filename):
 
     extracted_text = extract_text_from_image(filepath)
     expiry_status, expiry_date = parse_expiry_date(extracted_text)
-    damage_status, processed_filename = detect_damage(filepath)
+    damage_status, processed_filename = detect_damage(filepath, app.config['PROCESSED_FOLDER'])
 
     database.db.save_scan(
         original_filename,
@@ -59,10 +83,9 @@ def process():
     if not file or file.filename == "":
         return "No file uploaded", 400
 
-    save_path = os.path.join(app.config['UPLOAD_FOLDER'], file.filename)
-    file.save(save_path)
+    save_path, filename = save_upload(file, app.config['UPLOAD_FOLDER'])
 
-    extracted, status, date_val, damage, processed = _process_common(save_path, file.filename)
+    extracted, status, date_val, damage, processed = _process_common(save_path, filename)
 
     return render_template(
         "result.html",
@@ -81,13 +104,8 @@ def capture():
     if not img_data:
         return "No image data", 400
 
-    img_data = img_data.split(",")[1]
-
+    filepath = save_base64_capture(img_data, app.config['UPLOAD_FOLDER'])
     filename = f"captured_{datetime.now().strftime('%Y%m%d%H%M%S')}.png"
-    filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-
-    with open(filepath, "wb") as f:
-        f.write(base64.b64decode(img_data))
 
     extracted, status, date_val, damage, processed = _process_common(filepath, filename)
 
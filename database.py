@@ -1,7 +1,9 @@
+import os
 import sqlite3
 from datetime import datetime
 
-DB_NAME = "scans.db"
+# Point at a scratch file (e.g. for load tests) with DETECTMED_DB
+DB_NAME = os.environ.get("DETECTMED_DB", "scans.db")
 
 class Database:
     def __init__(self):
@@ -0,0 +1,333 @@
+# loadtest.py
+"""
+Local load generator for DetectMed.
+
+Start the app with the stub OCR engine so model time doesn't hide everything else:
+
+    mkdir -p /tmp/loadtest
+    DETECTMED_OCR_BACKEND=stub DETECTMED_OCR_STUB_LATENCY_MS=50 \\
+    DETECTMED_DB=/tmp/loadtest/scans.db \\
+    DETECTMED_UPLOAD_FOLDER=/tmp/loadtest/uploads \\
+    DETECTMED_PROCESSED_FOLDER=/tmp/loadtest/processed \\
+        gunicorn --workers 2 --threads 4 app:app
+
+then drive it:
+
+    python loadtest.py --url http://127.0.0.1:8000 --concurrency 16 --duration 30
+
+Every worker picks routes round-robin from the mix, so /process, /capture,
+/history and the report routes run concurrently. Pass --server-pid with the
+gunicorn master pid to also report each worker's peak RSS.
+
+With --probe-limits it instead sends max-size, just-over-limit and
+decompression-bomb images to /process and /capture one at a time and prints
+each worker's VmHWM/VmRSS before and after every request, so you can see the
+413 paths fire and that upload memory stays bounded. Run the server with
+--workers 1 for that, so every request lands on the worker being measured.
+
+The server stores every upload under its own generated name, so each /process
+and /capture request leaves one file in the upload folder and one in the
+processed folder. The DETECTMED_* paths above keep those files and the scan rows
+out of the repo's uploads/, processed/ and scans.db; delete /tmp/loadtest
+afterwards. The loadtest_<hex> client names only mark the rows in the history.
+"""
+import os
+import sys
+import time
+import zlib
+import base64
+import struct
+import argparse
+import threading
+from uuid import uuid4
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+DEFAULT_IMAGE = os.path.join("uploads", "test_med.jpg")
+# keep in sync with the server's DETECTMED_MAX_UPLOAD_BYTES
+MAX_UPLOAD_BYTES = int(os.environ.get("DETECTMED_MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
+
+# route name -> weight in the request mix
+DEFAULT_MIX = {
+    "process": 4,
+    "capture": 2,
+    "history": 4,
+    "weekly-report": 1,
+    "daily_report": 1,
+    "weekly_report_pdf": 1,
+}
+
+
+# ---------------- REQUESTS ----------------
+def build_calls(base_url, image_path):
+    with open(image_path, "rb") as f:
+        image_bytes = f.read()
+
+    ext = os.path.splitext(image_path)[1].lower() or ".png"
+    data_url = f"data:image/{ext.lstrip('.')};base64," + base64.b64encode(image_bytes).decode()
+
+    def process(s, t):
+        name = f"loadtest_{uuid4().hex}{ext}"
+        return s.post(f"{base_url}/process", files={"file": (name, image_bytes)}, timeout=t)
+
+    return {
+        "process": process,
+        "capture": lambda s, t: s.post(f"{base_url}/capture",
+                                       data={"imageData": data_url}, timeout=t),
+        "history": lambda s, t: s.get(f"{base_url}/history", params={"page": 1, "per_page": 8},
+                                     timeout=t),
+        "weekly-report": lambda s, t: s.get(f"{base_url}/weekly-report", timeout=t),
+        "daily_report": lambda s, t: s.get(f"{base_url}/daily_report", timeout=t),
+        "weekly_report_pdf": lambda s, t: s.get(f"{base_url}/weekly_report_pdf", timeout=t),
+    }
+
+
+def expand_mix(mix):
+    order = []
+    for route, weight in mix.items():
+        order.extend([route] * weight)
+    return order
+
+
+# ---------------- STATS ----------------
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, route, seconds, ok):
+        with self.lock:
+            self.latencies[route].append(seconds)
+            if not ok:
+                self.errors[route] += 1
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+# ---------------- SERVER MEMORY ----------------
+def _read_status_kb(pid, key):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(key + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _children(pid):
+    kids = []
+    try:
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/children") as f:
+                kids.extend(int(c) for c in f.read().split())
+    except OSError:
+        pass
+    return kids
+
+
+def server_peak_rss(pid):
+    """Peak RSS (VmHWM, in MB) of the server process and its workers (Linux only)."""
+    peaks = {}
+    for p in [pid] + _children(pid):
+        kb = _read_status_kb(p, "VmHWM")
+        if kb is not None:
+            peaks[p] = kb / 1024.0
+    return peaks
+
+
+def worker_memory(pid):
+    """{worker pid: (VmHWM MB, VmRSS MB)}; the server pid itself if it has no children."""
+    mem = {}
+    for p in _children(pid) or [pid]:
+        hwm, rss = _read_status_kb(p, "VmHWM"), _read_status_kb(p, "VmRSS")
+        if hwm is not None and rss is not None:
+            mem[p] = (hwm / 1024.0, rss / 1024.0)
+    return mem
+
+
+# ---------------- UPLOAD LIMIT PROBE ----------------
+def make_png(width, height):
+    """All-black 1-bit PNG; a 12000x8000 one is ~12 KB on disk and 96 Mpx decoded."""
+    def chunk(kind, data):
+        return (struct.pack(">I", len(data)) + kind + data
+                + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    row = b"\x00" * (1 + (width + 7) // 8)   # filter byte + packed pixels
+    raw = zlib.compress(row * height, 9)
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 1, 0, 0, 0, 0))
+            + chunk(b"IDAT", raw)
+            + chunk(b"IEND", b""))
+
+
+def limit_cases(max_bytes):
+    small = make_png(64, 64)
+    images = [
+        # trailing bytes after IEND are ignored by decoders but count toward the limit
+        ("max-size", small + b"\x00" * (max_bytes - len(small)), 200),
+        ("over-limit", small + b"\x00" * (max_bytes + 1 - len(small)), 413),
+        ("bomb-12000x8000", make_png(12000, 8000), 413),
+    ]
+    return [(label, route, body, expected)
+            for label, body, expected in images
+            for route in ("process", "capture")]
+
+
+def send_upload(session, base_url, route, body, timeout):
+    if route == "process":
+        name = f"loadtest_{uuid4().hex}.png"
+        return session.post(f"{base_url}/process", files={"file": (name, body)}, timeout=timeout)
+    data_url = "data:image/png;base64," + base64.b64encode(body).decode()
+    return session.post(f"{base_url}/capture", data={"imageData": data_url}, timeout=timeout)
+
+
+def probe_limits(base_url, server_pid, max_bytes, repeat=3, timeout=60):
+    """Send each limit case sequentially and print status plus worker memory per request."""
+    base_url = base_url.rstrip("/")
+    session = requests.Session()
+    failures = 0
+
+    header = (f"{'case':<18}{'route':<9}{'status':>7}{'want':>6}"
+              f"{'hwm_before':>12}{'hwm_after':>11}{'rss_delta':>11}")
+    print(header)
+    print("-" * len(header))
+
+    for label, route, body, expected in limit_cases(max_bytes):
+        for _ in range(repeat):
+            before = worker_memory(server_pid) if server_pid else {}
+            try:
+                status = send_upload(session, base_url, route, body, timeout).status_code
+            except Exception as e:
+                status = type(e).__name__
+            after = worker_memory(server_pid) if server_pid else {}
+
+            if status != expected:
+                failures += 1
+
+            pids = set(before) & set(after)
+            if pids:
+                hwm_before = max(before[p][0] for p in pids)
+                hwm_after = max(after[p][0] for p in pids)
+                rss_delta = sum(after[p][1] - before[p][1] for p in pids)
+                mem = f"{hwm_before:>12.1f}{hwm_after:>11.1f}{rss_delta:>+11.1f}"
+            else:
+                mem = f"{'-':>12}{'-':>11}{'-':>11}"
+            print(f"{label:<18}{route:<9}{status!s:>7}{expected:>6}{mem}")
+
+    print("-" * len(header))
+    print("memory in MB; hwm = worker peak RSS (VmHWM), max across workers")
+    print("all statuses as expected" if not failures else f"{failures} unexpected status(es)")
+    return failures
+
+
+# ---------------- RUN ----------------
+def worker(calls, order, offset, deadline, stats, timeout):
+    session = requests.Session()
+    i = offset
+    while time.monotonic() < deadline:
+        route = order[i % len(order)]
+        i += 1
+        start = time.monotonic()
+        try:
+            resp = calls[route](session, timeout)
+            ok = resp.status_code < 400
+        except Exception:
+            # connection resets, timeouts, SSL/encoding errors: count, keep going
+            ok = False
+        stats.record(route, time.monotonic() - start, ok)
+
+
+def run(base_url, image_path, concurrency, duration, mix, timeout=60):
+    calls = build_calls(base_url.rstrip("/"), image_path)
+    order = expand_mix(mix)
+    stats = Stats()
+
+    deadline = time.monotonic() + duration
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(worker, calls, order, n, deadline, stats, timeout)
+                   for n in range(concurrency)]
+        for future in futures:
+            future.result()   # surface harness bugs instead of silently losing clients
+    elapsed = time.monotonic() - started
+
+    return stats, elapsed
+
+
+def print_report(stats, elapsed):
+    header = f"{'route':<20}{'reqs':>7}{'rps':>8}{'err%':>7}{'p50ms':>9}{'p95ms':>9}{'p99ms':>9}{'maxms':>9}"
+    print(header)
+    print("-" * len(header))
+
+    total = total_errors = 0
+    for route in sorted(stats.latencies):
+        lat = sorted(stats.latencies[route])
+        count, errors = len(lat), stats.errors[route]
+        total += count
+        total_errors += errors
+        print(f"{route:<20}{count:>7}{count / elapsed:>8.1f}{100.0 * errors / count:>7.1f}"
+              f"{percentile(lat, 50) * 1000:>9.1f}{percentile(lat, 95) * 1000:>9.1f}"
+              f"{percentile(lat, 99) * 1000:>9.1f}{lat[-1] * 1000:>9.1f}")
+
+    print("-" * len(header))
+    if total:
+        print(f"{'TOTAL':<20}{total:>7}{total / elapsed:>8.1f}{100.0 * total_errors / total:>7.1f}")
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        route, _, weight = part.partition("=")
+        mix[route.strip()] = int(weight or 1)
+    return mix
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Concurrent load test for the DetectMed Flask app")
+    ap.add_argument("--url", default="http://127.0.0.1:8000")
+    ap.add_argument("--image", default=DEFAULT_IMAGE, help="image used for /process and /capture")
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--duration", type=float, default=20, help="seconds")
+    ap.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                    help="route weights, e.g. process=4,history=2")
+    ap.add_argument("--server-pid", type=int, help="server (gunicorn master) pid for RSS report")
+    ap.add_argument("--timeout", type=float, default=60)
+    ap.add_argument("--probe-limits", action="store_true",
+                    help="send max-size / over-limit / bomb uploads and report memory per request")
+    ap.add_argument("--max-bytes", type=int, default=MAX_UPLOAD_BYTES,
+                    help="server upload byte limit used to size the probe images")
+    ap.add_argument("--repeat", type=int, default=3, help="requests per probe case")
+    args = ap.parse_args()
+
+    if args.probe_limits:
+        failures = probe_limits(args.url, args.server_pid, args.max_bytes,
+                                args.repeat, args.timeout)
+        sys.exit(1 if failures else 0)
+
+    unknown = set(args.mix) - set(DEFAULT_MIX)
+    if unknown:
+        ap.error(f"unknown routes in --mix: {', '.join(sorted(unknown))}")
+
+    print(f"Driving {args.url} with {args.concurrency} clients for {args.duration}s")
+    stats, elapsed = run(args.url, args.image, args.concurrency, args.duration,
+                         args.mix, args.timeout)
+    print_report(stats, elapsed)
+
+    if args.server_pid:
+        print("\nServer peak RSS (MB):")
+        for pid, mb in server_peak_rss(args.server_pid).items():
+            print(f"  pid {pid}: {mb:.1f}")
+
+
+if __name__ == "__main__":
+    main()
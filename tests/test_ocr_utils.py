@@ -0,0 +1,41 @@
+import pytest
+
+from utils import ocr_utils
+from utils.ocr_utils import OCREngine, StubEngine, set_engine, get_engine, extract_text_from_image
+
+
+@pytest.fixture(autouse=True)
+def reset_engine(monkeypatch):
+    monkeypatch.setattr(ocr_utils, "_engine", None)
+
+
+def test_stub_by_name():
+    set_engine("stub")
+
+    assert isinstance(get_engine(), StubEngine)
+    assert extract_text_from_image("ignored.png") == ocr_utils.STUB_TEXT.split("|")
+
+
+def test_stub_configured_output():
+    set_engine(StubEngine(latency_ms=1, text="A | B||EXP 12/2027"))
+    assert extract_text_from_image("ignored.png") == ["A", "B", "EXP 12/2027"]
+
+
+def test_backend_from_env_setting(monkeypatch):
+    monkeypatch.setattr(ocr_utils, "OCR_BACKEND", "stub")
+    assert isinstance(get_engine(), StubEngine)
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        set_engine("nope")
+
+
+def test_engine_without_extract_fails_on_set(monkeypatch):
+    class Broken(OCREngine):
+        pass
+
+    monkeypatch.setitem(ocr_utils.ENGINES, "broken", Broken)
+    with pytest.raises(TypeError):
+        set_engine("broken")
+    assert ocr_utils._engine is None
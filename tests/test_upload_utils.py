@@ -0,0 +1,197 @@
+import io
+import os
+import base64
+import tracemalloc
+
+import pytest
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+from utils import upload_utils
+from utils.upload_utils import UploadError, save_upload, save_base64_capture
+
+
+def png_bytes(width=32, height=32, mode="RGB"):
+    buf = io.BytesIO()
+    Image.new(mode, (width, height)).save(buf, "PNG")
+    return buf.getvalue()
+
+
+def storage(data, filename):
+    return FileStorage(io.BytesIO(data), filename=filename)
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(upload_utils, "MAX_UPLOAD_BYTES", 64 * 1024)
+    monkeypatch.setattr(upload_utils, "MAX_IMAGE_PIXELS", 1_000_000)
+    # upload_utils sets this at import; keep Pillow's bomb guard on the same limit
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1_000_000)
+
+
+# ---------------- save_upload ----------------
+def test_upload_saved_inside_folder_with_unique_name(tmp_path, limits):
+    path, name = save_upload(storage(png_bytes(), "../../evil.png"), str(tmp_path))
+
+    assert os.path.dirname(path) == str(tmp_path)
+    assert path.endswith(".png")
+    assert name == "evil.png"
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+
+
+def test_same_client_name_does_not_collide(tmp_path, limits):
+    first, _ = save_upload(storage(png_bytes(), "a.png"), str(tmp_path))
+    second, _ = save_upload(storage(png_bytes(), "a.png"), str(tmp_path))
+
+    assert first != second
+    assert os.path.exists(first) and os.path.exists(second)
+
+
+def test_non_ascii_name_keeps_extension(tmp_path, limits):
+    path, _ = save_upload(storage(png_bytes(), "पैक.png"), str(tmp_path))
+    assert path.endswith(".png")
+
+
+def test_upload_over_byte_limit(tmp_path, limits):
+    data = png_bytes() + b"\0" * upload_utils.MAX_UPLOAD_BYTES
+
+    with pytest.raises(UploadError) as exc:
+        save_upload(storage(data, "big.png"), str(tmp_path))
+
+    assert exc.value.status == 413
+    assert os.listdir(tmp_path) == []
+
+
+def test_upload_bomb_header_rejected(tmp_path, limits):
+    with pytest.raises(UploadError) as exc:
+        save_upload(storage(png_bytes(2000, 2000, "1"), "bomb.png"), str(tmp_path))
+
+    assert exc.value.status == 413
+    assert os.listdir(tmp_path) == []
+
+
+def test_pillow_bomb_error_path(tmp_path, limits, monkeypatch):
+    # only Pillow's own guard (> 2x its limit) can reject this one
+    monkeypatch.setattr(upload_utils, "MAX_IMAGE_PIXELS", 10 ** 12)
+
+    with pytest.raises(UploadError) as exc:
+        save_upload(storage(png_bytes(2000, 2000, "1"), "bomb.png"), str(tmp_path))
+
+    assert exc.value.status == 413
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.filterwarnings("ignore::PIL.Image.DecompressionBombWarning")
+def test_pixel_limit_below_pillow_error(tmp_path, limits):
+    # 1.44 Mpx: over our limit but under 2x, where Pillow only warns
+    with pytest.raises(UploadError) as exc:
+        save_upload(storage(png_bytes(1200, 1200, "1"), "big.png"), str(tmp_path))
+
+    assert exc.value.status == 413
+    assert os.listdir(tmp_path) == []
+
+
+def test_rejected_upload_leaves_existing_file(tmp_path, limits):
+    existing = tmp_path / "test_med.jpg"
+    existing.write_bytes(b"original")
+
+    with pytest.raises(UploadError) as exc:
+        save_upload(storage(b"not an image", "test_med.jpg"), str(tmp_path))
+
+    assert exc.value.status == 400
+    assert existing.read_bytes() == b"original"
+    assert os.listdir(tmp_path) == ["test_med.jpg"]
+
+
+# ---------------- save_base64_capture ----------------
+def data_url(data, pad=True):
+    encoded = base64.b64encode(data).decode()
+    return "data:image/png;base64," + (encoded if pad else encoded.rstrip("="))
+
+
+def test_capture_roundtrip(tmp_path, limits):
+    data = png_bytes(33, 17)
+    path = save_base64_capture(data_url(data), str(tmp_path))
+
+    with open(path, "rb") as f:
+        assert f.read() == data
+
+
+def test_capture_unpadded(tmp_path, limits):
+    data = png_bytes(33, 17)
+    assert len(data) % 3   # otherwise there is no padding to drop
+
+    path = save_base64_capture(data_url(data, pad=False), str(tmp_path))
+
+    with open(path, "rb") as f:
+        assert f.read() == data
+
+
+@pytest.mark.parametrize("value", ["no-comma-here", "data:image/png;base64,@@@@"])
+def test_capture_malformed(tmp_path, limits, value):
+    with pytest.raises(UploadError) as exc:
+        save_base64_capture(value, str(tmp_path))
+
+    assert exc.value.status == 400
+    assert os.listdir(tmp_path) == []
+
+
+def test_capture_over_byte_limit(tmp_path, limits):
+    data = png_bytes() + b"\0" * upload_utils.MAX_UPLOAD_BYTES
+
+    with pytest.raises(UploadError) as exc:
+        save_base64_capture(data_url(data), str(tmp_path))
+
+    assert exc.value.status == 413
+    assert os.listdir(tmp_path) == []
+
+
+def test_capture_bomb_header_rejected(tmp_path, limits):
+    with pytest.raises(UploadError) as exc:
+        save_base64_capture(data_url(png_bytes(2000, 2000, "1")), str(tmp_path))
+
+    assert exc.value.status == 413
+    assert os.listdir(tmp_path) == []
+
+
+def test_capture_does_not_copy_payload(tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_utils, "MAX_UPLOAD_BYTES", 16 * 1024 * 1024)
+    monkeypatch.setattr(upload_utils, "MAX_CAPTURE_CHARS", 24 * 1024 * 1024)
+    value = data_url(png_bytes() + b"\0" * (8 * 1024 * 1024))
+
+    tracemalloc.start()
+    try:
+        save_base64_capture(value, str(tmp_path))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # a few decode chunks, not another copy of the ~11 MB string
+    assert peak < len(value) // 10
+
+
+# ---------------- saved suffix ----------------
+def image_bytes(fmt):
+    buf = io.BytesIO()
+    Image.new("RGB", (16, 16)).save(buf, fmt)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("fmt, client_name, suffix", [
+    ("PNG", "x.txt", ".png"),
+    ("JPEG", "x.png", ".jpg"),
+    ("WEBP", "noext", ".webp"),
+])
+def test_suffix_follows_real_format(tmp_path, limits, fmt, client_name, suffix):
+    path, _ = save_upload(storage(image_bytes(fmt), client_name), str(tmp_path))
+
+    assert path.endswith(suffix)
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+
+
+def test_unsupported_format_rejected(tmp_path, limits):
+    with pytest.raises(UploadError) as exc:
+        save_upload(storage(image_bytes("GIF"), "x.gif"), str(tmp_path))
+
+    assert exc.value.status == 400
+    assert os.listdir(tmp_path) == []
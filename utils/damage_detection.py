@@ -2,7 +2,7 @@ import cv2
 import os
 import numpy as np
 
-def detect_damage(image_path):
+def detect_damage(image_path, output_folder="processed"):
     img = cv2.imread(image_path)
 
     # Convert to grayscale & blur
@@ -20,7 +20,7 @@ def detect_damage(image_path):
 
     # Save file
     filename = "processed_" + os.path.basename(image_path)
-    output_path = os.path.join("processed", filename)
+    output_path = os.path.join(output_folder, filename)
 
     cv2.imwrite(output_path, combined)
 
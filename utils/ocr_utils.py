@@ -1,27 +1,110 @@
-import cv2
-import easyocr
-import pytesseract
-import numpy as np
+import os
+import time
+import threading
+from abc import ABC, abstractmethod
+
+# Which engine extract_text_from_image() uses: "easyocr" (real models) or "stub"
+OCR_BACKEND = os.environ.get("DETECTMED_OCR_BACKEND", "easyocr")
+
+# Stub engine settings (for load tests without the ML models)
+STUB_LATENCY_MS = float(os.environ.get("DETECTMED_OCR_STUB_LATENCY_MS", 0))
+STUB_TEXT = os.environ.get("DETECTMED_OCR_STUB_TEXT", "PARACETAMOL 500mg|MFG 01/2025|EXP 12/2027")
 
-reader = easyocr.Reader(['en'])
 
 def preprocess_image(image_path):
+    # imported here so the stub engine runs without OpenCV installed
+    import cv2
+
     img = cv2.imread(image_path)
     gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
     blur = cv2.GaussianBlur(gray, (3, 3), 0)
     return blur
 
-def extract_text_from_image(image_path):
-    img = preprocess_image(image_path)
 
-    # EasyOCR extraction
-    easy_text = reader.readtext(img, detail=0)
+class OCREngine(ABC):
+    """Backend interface: turn an image file into a list of text lines."""
+
+    @abstractmethod
+    def extract(self, image_path):
+        ...
+
+
+class EasyTesseractEngine(OCREngine):
+    """EasyOCR + Tesseract; models are loaded on first use, not at import."""
+
+    def __init__(self):
+        self.reader = None
+        self._lock = threading.Lock()
+
+    def get_reader(self):
+        # gunicorn --threads: only the first request in a worker loads the models
+        if self.reader is None:
+            with self._lock:
+                if self.reader is None:
+                    import easyocr
+                    self.reader = easyocr.Reader(['en'])
+        return self.reader
+
+    def extract(self, image_path):
+        import pytesseract
+
+        reader = self.get_reader()
+        img = preprocess_image(image_path)
+
+        # EasyOCR extraction
+        easy_text = reader.readtext(img, detail=0)
+
+        # Tesseract extraction
+        tess_text = pytesseract.image_to_string(img)
 
-    # Tesseract extraction
-    tess_text = pytesseract.image_to_string(img)
+        # Combine and remove duplicates
+        all_text = easy_text + tess_text.split("\n")
+        cleaned = [t.strip() for t in all_text if t.strip()]
 
-    # Combine and remove duplicates
-    all_text = easy_text + tess_text.split("\n")
-    cleaned = [t.strip() for t in all_text if t.strip()]
+        return cleaned
 
-    return cleaned
+
+class StubEngine(OCREngine):
+    """Deterministic engine: sleeps a fixed time and returns fixed lines."""
+
+    def __init__(self, latency_ms=STUB_LATENCY_MS, text=STUB_TEXT):
+        self.latency_ms = latency_ms
+        self.lines = [t.strip() for t in text.split("|") if t.strip()]
+
+    def extract(self, image_path):
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000.0)
+        return list(self.lines)
+
+
+ENGINES = {
+    "easyocr": EasyTesseractEngine,
+    "stub": StubEngine,
+}
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def set_engine(engine):
+    """Swap the active backend (an OCREngine instance or a name in ENGINES)."""
+    global _engine
+    if isinstance(engine, str):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown OCR backend: {engine}")
+        engine = ENGINES[engine]()
+    if not isinstance(engine, OCREngine):
+        raise TypeError("OCR backend must be an OCREngine")
+    _engine = engine
+
+
+def get_engine():
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                set_engine(OCR_BACKEND)
+    return _engine
+
+
+def extract_text_from_image(image_path):
+    return get_engine().extract(image_path)
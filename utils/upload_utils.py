@@ -0,0 +1,162 @@
+import os
+import base64
+import tempfile
+import binascii
+from PIL import Image
+from werkzeug.utils import secure_filename
+
+# Configuration / limits (override through the environment)
+MAX_UPLOAD_BYTES = int(os.environ.get("DETECTMED_MAX_UPLOAD_BYTES", 10 * 1024 * 1024))
+MAX_IMAGE_PIXELS = int(os.environ.get("DETECTMED_MAX_IMAGE_PIXELS", 40_000_000))
+CHUNK_SIZE = 64 * 1024
+
+# base64 turns every 3 bytes into 4 chars, plus room for the "data:...;base64," prefix
+MAX_CAPTURE_CHARS = (MAX_UPLOAD_BYTES + 2) // 3 * 4 + 256
+
+# Formats the OpenCV pipeline reads and writes -> saved suffix
+IMAGE_EXTS = {"PNG": ".png", "JPEG": ".jpg", "WEBP": ".webp", "BMP": ".bmp"}
+
+# Pillow refuses anything over 2x this limit on its own; keep it in line with ours
+Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+
+
+class UploadError(Exception):
+    """Raised when an upload is rejected; carries the HTTP status to return."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def _discard(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _open_unique(folder, prefix, ext):
+    """Create a fresh file in folder; concurrent requests never share a path."""
+    fd, path = tempfile.mkstemp(dir=folder, prefix=prefix, suffix=ext)
+    return os.fdopen(fd, "wb"), path
+
+
+def _finalize(tmp_path, prefix, fmt):
+    """Move a checked upload to a unique name whose suffix matches its real format."""
+    ext = IMAGE_EXTS.get(fmt)
+    if ext is None:
+        raise UploadError("Unsupported image format", 400)
+
+    fd, path = tempfile.mkstemp(dir=os.path.dirname(tmp_path), prefix=prefix, suffix=ext)
+    os.close(fd)
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        _discard(path)
+        raise
+    return path
+
+
+def check_image(path):
+    """
+    Read only the image header and reject oversized / non-image files.
+    Returns the Pillow format name (e.g. "PNG", "JPEG").
+    """
+    try:
+        with Image.open(path) as img:
+            width, height = img.size
+            fmt = img.format
+    except Image.DecompressionBombError:
+        raise UploadError("Image dimensions too large", 413)
+    except Exception:
+        raise UploadError("Uploaded file is not a valid image", 400)
+
+    if width * height > MAX_IMAGE_PIXELS:
+        raise UploadError("Image dimensions too large", 413)
+
+    return fmt
+
+
+def save_upload(file, folder):
+    """
+    Copy an uploaded FileStorage to a unique file in folder in chunks, enforcing
+    the byte limit, then validate the image header before anything decodes the
+    pixels. The saved suffix comes from the detected format; the client
+    filename is only used for display.
+    Returns (filepath, display_name).
+    """
+    prefix = "upload_"
+    out, filepath = _open_unique(folder, prefix, ".part")
+    written = 0
+
+    try:
+        with out:
+            while True:
+                chunk = file.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > MAX_UPLOAD_BYTES:
+                    raise UploadError("File too large", 413)
+                out.write(chunk)
+
+        if written == 0:
+            raise UploadError("Uploaded file is empty", 400)
+
+        fmt = check_image(filepath)
+        filepath = _finalize(filepath, prefix, fmt)
+    except Exception:
+        # only ever our own unique file
+        _discard(filepath)
+        raise
+
+    display_name = secure_filename(file.filename or "") or os.path.basename(filepath)
+    return filepath, display_name
+
+
+def save_base64_capture(data_url, folder):
+    """
+    Decode a camera data URL ("data:image/png;base64,....") to a unique file
+    in folder in chunks, so the decoded bytes never sit in memory alongside
+    the encoded string. Returns the saved filepath.
+    """
+    # offsets rather than partition(): slicing off the prefix would copy the payload
+    comma = data_url.find(",")
+    if comma < 0:
+        raise UploadError("Malformed image data", 400)
+
+    first, end = comma + 1, len(data_url)
+    if end - first > MAX_CAPTURE_CHARS:
+        raise UploadError("Image data too large", 413)
+
+    prefix = "captured_"
+    out, filepath = _open_unique(folder, prefix, ".part")
+    # multiple of 4 so every slice decodes on its own
+    step = CHUNK_SIZE // 4 * 4
+    written = 0
+
+    try:
+        with out:
+            for start in range(first, end, step):
+                part = data_url[start:start + step]
+                # some encoders drop the trailing '=' padding
+                part += "=" * (-len(part) % 4)
+                try:
+                    chunk = base64.b64decode(part, validate=True)
+                except (binascii.Error, ValueError):
+                    raise UploadError("Malformed image data", 400)
+                written += len(chunk)
+                if written > MAX_UPLOAD_BYTES:
+                    raise UploadError("Image data too large", 413)
+                out.write(chunk)
+
+        if written == 0:
+            raise UploadError("No image data", 400)
+
+        fmt = check_image(filepath)
+        filepath = _finalize(filepath, prefix, fmt)
+    except Exception:
+        # only ever our own unique file
+        _discard(filepath)
+        raise
+
+    return filepath